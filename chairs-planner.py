@@ -1,12 +1,104 @@
 import sys
 import re
-import fileinput
 import unittest
 from collections import deque
 
+# numpy, scipy and numba are optional: when available, rooms are labeled
+# in one connected-components pass (scipy) and/or the flood fill runs as
+# a compiled kernel (numba), otherwise pure-Python fallbacks are used
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+try:
+    from scipy import ndimage
+except ImportError:
+    ndimage = None
+
 CHAIR_TYPES = ['W', 'P', 'S', 'C']
 WALL_TYPES = ['+', '-', '|', '\\', '/', '\n']
 VISITED = 'X'
+_VISITED = ord(VISITED)
+
+# 256-entry lookup tables indexed by cell byte value:
+# CHAIR_TABLE maps a chair to its 1-based index in CHAIR_TYPES,
+# BLOCK_TABLE marks cells the flood fill must not enter (walls and visited)
+CHAIR_TABLE = bytes(1 + CHAIR_TYPES.index(chr(b)) if chr(b) in CHAIR_TYPES else 0 for b in range(256))
+BLOCK_TABLE = bytes(1 if chr(b) in WALL_TYPES or b == _VISITED else 0 for b in range(256))
+
+# chair byte values in CHAIR_TYPES order, for counting on byte buffers
+_CHAIR_ORDS = tuple(ord(chair) for chair in CHAIR_TYPES)
+
+# room name is a single line text inside parenthesis, e.g. (room 1)
+_ROOM_RE = re.compile(r'\(([^)]*)\)')
+
+if np is not None:
+    _CHAIR_TABLE_ARR = np.frombuffer(CHAIR_TABLE, dtype=np.uint8)
+    _BLOCK_TABLE_ARR = np.frombuffer(BLOCK_TABLE, dtype=np.uint8)
+
+if njit is not None:
+    @njit(cache=True)
+    def _flood_fill_numba(buf, w, seed, chair_table, block_table, counts):
+        '''
+        BFS flood fill on the flat uint8 grid, compiled by numba
+        Chair counts are accumulated into counts (one slot per
+        CHAIR_TYPES entry), visited cells are marked as X in buf
+        Cells are counted and marked visited at enqueue time, so each
+        cell enters the queue at most once
+        '''
+        size = buf.shape[0]
+        q = np.empty(size, dtype=np.int32)
+        cell = buf[seed]
+        if block_table[cell]:
+            return
+        kind = chair_table[cell]
+        if kind:
+            counts[kind - 1] += 1
+        buf[seed] = 88  # ord('X'), mark visited
+        q[0] = seed
+        head = 0
+        tail = 1
+        while head < tail:
+            idx = q[head]
+            head += 1
+            nidx = idx + 1
+            if nidx % w != 0 and not block_table[buf[nidx]]:
+                kind = chair_table[buf[nidx]]
+                if kind:
+                    counts[kind - 1] += 1
+                buf[nidx] = 88
+                q[tail] = nidx
+                tail += 1
+            nidx = idx - 1
+            if idx % w != 0 and not block_table[buf[nidx]]:
+                kind = chair_table[buf[nidx]]
+                if kind:
+                    counts[kind - 1] += 1
+                buf[nidx] = 88
+                q[tail] = nidx
+                tail += 1
+            nidx = idx + w
+            if nidx < size and not block_table[buf[nidx]]:
+                kind = chair_table[buf[nidx]]
+                if kind:
+                    counts[kind - 1] += 1
+                buf[nidx] = 88
+                q[tail] = nidx
+                tail += 1
+            nidx = idx - w
+            if nidx >= 0 and not block_table[buf[nidx]]:
+                kind = chair_table[buf[nidx]]
+                if kind:
+                    counts[kind - 1] += 1
+                buf[nidx] = 88
+                q[tail] = nidx
+                tail += 1
+else:
+    _flood_fill_numba = None
 
 class Room:
     def __init__(self, name: str, x: int = 0, y: int = 0):
@@ -16,94 +108,274 @@ class Room:
         self.name = name
         self.x = x
         self.y = y
-        self.chairs = {type: 0 for type in CHAIR_TYPES}
+        # counts per chair type, indexed by position in CHAIR_TYPES
+        self.chairs = [0] * len(CHAIR_TYPES)
 
     def chairs_str(self):
-        return ', '.join([f'{type}: {count}' for type, count in self.chairs.items()])
+        return ', '.join([f'{type}: {count}' for type, count in zip(CHAIR_TYPES, self.chairs)])
+
+
+def _check_room_name(name, pos, names_seen, rooms_found):
+    '''
+    Validate a room name found at pos: raises on empty or duplicate
+    The original position of a duplicate is looked up in rooms_found
+    only on the error path, so the scan needs just one set check
+    '''
+    if name == '':
+        raise RuntimeError(f'Empty room name at {pos}')
+    if name in names_seen:
+        first = next(p for n, p in rooms_found if n == name)
+        raise RuntimeError(f'Duplicate room name {name}, initially defined at {first}')
 
 
 class Plan:
     def __init__(self):
-        self.plan = []
+        self.buf = bytearray()
+        self.w = 0
+        self.h = 0
+
+    def _load(self, lines):
+        '''
+        Store lines as a single flat byte grid with row stride self.w,
+        padding shorter lines with spaces
+        '''
+        self.h = len(lines)
+        self.w = max((len(line) for line in lines), default=0)
+        self.buf = bytearray(''.join(line.ljust(self.w) for line in lines).encode('ascii'))
+
+    def _lines(self):
+        '''
+        Decode the byte grid back to a list of (padded) row strings
+        '''
+        w = self.w
+        return [self.buf[y * w:(y + 1) * w].decode('ascii') for y in range(self.h)]
 
     def _get(self, x, y):
-        if 0 <= y < len(self.plan) and 0 <= x < len(self.plan[y]):
-            return self.plan[y][x]
+        if (x | y) >= 0 and x < self.w and y < self.h:
+            return self.buf[y * self.w + x]
         else:
             return None
 
     def _set(self, x, y, value):
-        if 0 <= y < len(self.plan) and 0 <= x < len(self.plan[y]):
-            self.plan[y] = self.plan[y][:x] + value + self.plan[y][x + 1:]
+        if (x | y) >= 0 and x < self.w and y < self.h:
+            self.buf[y * self.w + x] = value
 
-    # read plan as bitmap from a file or stdin (when filename is None), check bounds and shape
+    # read plan as bitmap from a file or stdin (when filename is empty), check bounds and shape
     def read(self, filename):
-        self.plan = []
-        for line in fileinput.input(filename):
-            self.plan.append(line)
+        if isinstance(filename, str):
+            filename = [filename]
+        if filename:
+            with open(filename[0], 'rb') as f:
+                data = f.read()
+        else:
+            data = sys.stdin.buffer.read()
+        lines = data.split(b'\n')
+        if lines and lines[-1] == b'':
+            # trailing newline at end of input
+            lines.pop()
+        # one allocation for the whole grid, rows copied in place
+        self.h = len(lines)
+        self.w = max((len(line) for line in lines), default=0)
+        w = self.w
+        self.buf = bytearray(b' ' * (w * self.h))
+        for row, line in enumerate(lines):
+            self.buf[row * w:row * w + len(line)] = line
 
     def find_chairs_in_rooms(self) -> list[Room]:
+        '''
+        The per-room fills run sequentially on purpose: a process-pool
+        variant was tried and lost at every scale, because pickling a
+        grid snapshot per room and scanning each worker's full grid
+        for visited spans costs O(grid * rooms) against the O(grid)
+        total of the sequential fills
+        '''
         total = Room('total')
         rooms = self._find_rooms()
+        if ndimage is not None and rooms:
+            # label all rooms in one connected-components pass
+            self._label_rooms(rooms)
+        else:
+            # immutable snapshot of the plan (after name erasing) so chair
+            # counting is not affected by the visited marks
+            orig = bytes(self.buf)
+            for room in rooms:
+                self._find_chairs(room, orig)
+        # accumulate the total once per room, outside the fill hot loops
         for room in rooms:
-            self._find_chairs(room, total)
+            for kind in range(len(CHAIR_TYPES)):
+                total.chairs[kind] += room.chairs[kind]
         return [total, *rooms]
 
+    def _label_rooms(self, rooms: list[Room]):
+        '''
+        Label every 4-connected component of non-wall cells in a single
+        scipy.ndimage.label pass, then tally chairs per component with
+        one np.bincount per chair type and read each room's tally by
+        the component id at its seed position
+        Visited cells (components holding a room seed) will be marked
+        as X on the plan, like the flood fill does
+        '''
+        arr = np.frombuffer(self.buf, dtype=np.uint8).reshape(self.h, self.w)
+        open_mask = _BLOCK_TABLE_ARR[arr] == 0
+        # 4-connectivity, same as the flood fill directions
+        structure = [[0, 1, 0], [1, 1, 1], [0, 1, 0]]
+        labels, nlabels = ndimage.label(open_mask, structure=structure)
+        counts = [np.bincount(labels[arr == ord(chair)], minlength=nlabels + 1)
+                  for chair in CHAIR_TYPES]
+        seed_labels = []
+        for room in rooms:
+            label = labels[room.y, room.x]
+            seed_labels.append(label)
+            for kind in range(len(CHAIR_TYPES)):
+                n = int(counts[kind][label])
+                if n:
+                    room.chairs[kind] += n
+        arr[np.isin(labels, seed_labels)] = _VISITED
+
     def _find_rooms(self) -> list[Room]:
         '''
         Returns rooms list sorted by name
         Room names will be erased on self.plan
         '''
-        found = dict()
-        pattern = r'\(([^)]*)\)'
-        for row, line in enumerate(self.plan):
-            replaced = ''
-            for match in re.finditer(pattern, line):
+        if np is not None:
+            return self._find_rooms_np()
+
+        names_seen = set()
+        rooms_found = []
+        buf = self.buf
+        w = self.w
+        finditer = _ROOM_RE.finditer
+        for row in range(self.h):
+            # decode one row at a time for the regex scan
+            row_off = row * w
+            line = buf[row_off:row_off + w].decode('ascii')
+            for match in finditer(line):
                 name = match.group(1).strip()
                 start = match.start()
                 end = match.end()
                 pos = (row, start)
-                if name == '':
-                    raise RuntimeError(f'Empty room name at {pos}')
-                if name in found:
-                    raise RuntimeError(f'Duplicate room name {name}, initially defined at {found[name]}')
-                found[name] = pos
-                replaced = replaced[:start] if replaced else line[:start]
-                replaced += ' ' * (end - start)
-                replaced += line[end:]
-            if replaced:
-                self.plan[row] = replaced
+                _check_room_name(name, pos, names_seen, rooms_found)
+                names_seen.add(name)
+                rooms_found.append((name, pos))
+                # blank out the name in place
+                buf[row_off + start:row_off + end] = b' ' * (end - start)
 
-        return [Room(name, x, y) for name, (y, x) in sorted(found.items())]
+        rooms_found.sort()
+        return [Room(name, x, y) for name, (y, x) in rooms_found]
+
+    def _find_rooms_np(self) -> list[Room]:
+        '''
+        Vectorized variant of _find_rooms: all ( and ) positions are
+        located with two C-level scans over the flat grid, then paired
+        left to right within each row like the regex does
+        '''
+        names_seen = set()
+        rooms_found = []
+        buf = self.buf
+        w = self.w
+        flat = np.frombuffer(buf, dtype=np.uint8)
+        opens = np.flatnonzero(flat == ord('('))
+        closes = np.flatnonzero(flat == ord(')'))
+        nclose = len(closes)
+        ci = 0       # first not yet consumed ')'
+        consumed = 0 # end of the last matched name
+        for o in opens:
+            o = int(o)
+            if o < consumed:
+                # inside an already matched name
+                continue
+            while ci < nclose and closes[ci] <= o:
+                ci += 1
+            if ci == nclose:
+                break
+            c = int(closes[ci])
+            row = o // w
+            if c // w != row:
+                # no ')' left on this row
+                continue
+            name = buf[o + 1:c].decode('ascii').strip()
+            pos = (row, o - row * w)
+            _check_room_name(name, pos, names_seen, rooms_found)
+            names_seen.add(name)
+            rooms_found.append((name, pos))
+            # blank out the name in place
+            buf[o:c + 1] = b' ' * (c + 1 - o)
+            consumed = c + 1
+            ci += 1
+
+        rooms_found.sort()
+        return [Room(name, x, y) for name, (y, x) in rooms_found]
 
 
-    def _find_chairs(self, room: Room, total: Room):
+    def _find_chairs(self, room: Room, orig: bytes = None):
         '''
-        Use non-recursive flood fill algorithm with 4 directions
+        Use non-recursive flood fill algorithm
         (see https://en.wikipedia.org/wiki/Flood_fill)
-        Visited cells will be marked as X on the plan
+        When numba is available, the fill runs as a compiled BFS
+        kernel; otherwise a pure-Python scanline fill is used:
+        Each popped seed expands to the whole horizontal run between
+        walls; the run is counted and marked visited with slice
+        operations, then the rows above and below are scanned for new
+        seeds (one per maximal open run)
+        Visited cells will be marked as X on the plan; this is an O(1)
+        byte write (or one slice assignment per run) on the flat
+        buffer, so no separate visited set is kept, and chair counting
+        stays correct because it reads the orig snapshot
         '''
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-    
-        q = deque([(room.x, room.y)])
+        buf = self.buf
+        w = self.w
+        size = len(buf)
+
+        if _flood_fill_numba is not None:
+            counts = np.zeros(len(CHAIR_TYPES), dtype=np.int64)
+            _flood_fill_numba(np.frombuffer(buf, dtype=np.uint8), w,
+                              room.y * w + room.x,
+                              _CHAIR_TABLE_ARR, _BLOCK_TABLE_ARR, counts)
+            for kind, n in enumerate(counts):
+                if n:
+                    room.chairs[kind] += int(n)
+            return
+
+        if orig is None:
+            orig = bytes(buf)
+
+        q = deque([room.y * w + room.x])
+        # constants for the loop below, computed once per fill
+        offsets = (-w, w)
+        mark = VISITED.encode('ascii')
+        # bind hot callables and globals to locals (LOAD_FAST in the loop)
+        popleft = q.popleft
+        append = q.append
+        count = orig.count
+        block = BLOCK_TABLE
         while q:
-            x, y = q.popleft()
-            cell = self._get(x, y)
-            if cell == VISITED:
+            idx = popleft()
+            if block[buf[idx]]:
                 continue
-            if cell in CHAIR_TYPES:
-                # found a chair
-                room.chairs[cell] += 1
-                total.chairs[cell] += 1
-            # mark visited
-            self._set(x, y, VISITED)
-            # explore all directions (BFS)
-            for dx, dy in directions:
-                new_x = x + dx
-                new_y = y + dy
-                cell = self._get(new_x, new_y)
-                if cell and (cell != VISITED) and (cell not in WALL_TYPES):
-                    q.append((new_x, new_y))
+            # expand the seed to the full run [a, b) between walls
+            row = idx - idx % w
+            a = idx
+            while a > row and not block[buf[a - 1]]:
+                a -= 1
+            b = idx + 1
+            row_end = row + w
+            while b < row_end and not block[buf[b]]:
+                b += 1
+            # count chairs on the run (C-level scan), then mark it visited at once
+            for kind, chair in enumerate(_CHAIR_ORDS):
+                n = count(chair, a, b)
+                if n:
+                    room.chairs[kind] += n
+            buf[a:b] = mark * (b - a)
+            # seed the rows above and below the run
+            for off in offsets:
+                if a + off >= 0 and b + off <= size:
+                    prev_open = False
+                    for nidx in range(a + off, b + off):
+                        is_open = not block[buf[nidx]]
+                        if is_open and not prev_open:
+                            append(nidx)
+                        prev_open = is_open
 
 class RoomTests(unittest.TestCase):
     def test_init(self):
@@ -111,53 +383,58 @@ class RoomTests(unittest.TestCase):
         self.assertEqual(room1.name, 'room1')
         self.assertEqual(room1.x, 0)
         self.assertEqual(room1.y, 0)
-        self.assertEqual(room1.chairs, dict(W=0, P=0, S=0, C=0))
+        self.assertEqual(room1.chairs, [0, 0, 0, 0])  # W, P, S, C
 
     def test_chairs_str(self):
         room2 = Room('room 2', 1, 2)
         self.assertEqual(room2.name, 'room 2')
         self.assertEqual(room2.x, 1)
         self.assertEqual(room2.y, 2)
-        self.assertEqual(room2.chairs, dict(W=0, P=0, S=0, C=0))
+        self.assertEqual(room2.chairs, [0, 0, 0, 0])
         self.assertEqual(room2.chairs_str(), "W: 0, P: 0, S: 0, C: 0")
 
-        room2.chairs['P'] += 3
-        room2.chairs['C'] = 4
-        self.assertEqual(room2.chairs, dict(W=0, P=3, S=0, C=4))
+        room2.chairs[CHAIR_TYPES.index('P')] += 3
+        room2.chairs[CHAIR_TYPES.index('C')] = 4
+        self.assertEqual(room2.chairs, [0, 3, 0, 4])
         self.assertEqual(room2.chairs_str(), "W: 0, P: 3, S: 0, C: 4")
 
 
 class PlanTests(unittest.TestCase):
     def test_init(self):
         plan = Plan()
-        self.assertEqual(plan.plan, [])
+        self.assertEqual(plan.buf, bytearray())
+        self.assertEqual(plan.w, 0)
+        self.assertEqual(plan.h, 0)
 
     # Returns the value at the given x, y coordinates when they are within the bounds of the plan
     def test_cell_access(self):
         plan = Plan()
-        plan.plan = ['abc123',
-                     'def',
-                     'ghijklmn']
-        self.assertEqual(plan._get(0, 0), 'a')
-        self.assertEqual(plan._get(1, 1), 'e')
-        self.assertEqual(plan._get(6, 2), 'm')
+        plan._load(['abc123',
+                    'def',
+                    'ghijklmn'])
+        self.assertEqual(plan.w, 8)
+        self.assertEqual(plan.h, 3)
+        self.assertEqual(plan._get(0, 0), ord('a'))
+        self.assertEqual(plan._get(1, 1), ord('e'))
+        self.assertEqual(plan._get(6, 2), ord('m'))
         self.assertEqual(plan._get(-1, -99), None)
-        self.assertEqual(plan._get(4, 1), None)
+        self.assertEqual(plan._get(4, 1), ord(' '))  # padded up to plan.w
+        self.assertEqual(plan._get(8, 1), None)
 
-        plan._set(1, 2, 'X')
-        plan._set(4, 0, 'Y')
-        plan._set(-1, -1, 'Q')
-        plan._set(10, 0, 'W')
-        self.assertEqual(plan.plan, ['abc1Y3',
-                                     'def',
-                                     'gXijklmn'])
+        plan._set(1, 2, ord('X'))
+        plan._set(4, 0, ord('Y'))
+        plan._set(-1, -1, ord('Q'))
+        plan._set(10, 0, ord('W'))
+        self.assertEqual(plan._lines(), ['abc1Y3  ',
+                                         'def     ',
+                                         'gXijklmn'])
 
     def test_find_rooms(self):
         plan = Plan()
-        plan.plan = ['+-----------------+',
-                     '|(A) ( long name )|',
-                     '+-----------------+']
-    
+        plan._load(['+-----------------+',
+                    '|(A) ( long name )|',
+                    '+-----------------+'])
+
         rooms = plan._find_rooms()
         self.assertEqual(len(rooms), 2)
         self.assertEqual(rooms[0].name, 'A')
@@ -166,44 +443,44 @@ class PlanTests(unittest.TestCase):
         self.assertEqual(rooms[1].name, 'long name')
         self.assertEqual(rooms[1].x, 5)
         self.assertEqual(rooms[1].y, 1)
-        self.assertEqual(plan.plan, ['+-----------------+',
-                                     '|                 |',
-                                     '+-----------------+'])
+        self.assertEqual(plan._lines(), ['+-----------------+',
+                                         '|                 |',
+                                         '+-----------------+'])
         # second call finds nothing more
         rooms = plan._find_rooms()
         self.assertEqual(len(rooms), 0)
 
     def test_find_no_rooms(self):
         plan = Plan()
-        plan.plan = ['+----+',
-                     '|    |',
-                     '+----+']
+        plan._load(['+----+',
+                    '|    |',
+                    '+----+'])
         rooms = plan._find_rooms()
         self.assertEqual(rooms, [])
-        self.assertEqual(plan.plan, ['+----+',
-                                     '|    |',
-                                     '+----+'])
+        self.assertEqual(plan._lines(), ['+----+',
+                                         '|    |',
+                                         '+----+'])
 
     def test_empty_room_name(self):
         plan = Plan()
-        plan.plan = ['+-+',
-                     '|()|',
-                     '+-+']
+        plan._load(['+-+',
+                    '|()|',
+                    '+-+'])
         with self.assertRaises(RuntimeError):
             plan._find_rooms()
 
     def test_duplicate_room_name(self):
         plan = Plan()
-        plan.plan = ['+-+',
-                     '|(A)|',
-                     '|(A)|',
-                     '+-+']
+        plan._load(['+-+',
+                    '|(A)|',
+                    '|(A)|',
+                    '+-+'])
         with self.assertRaises(RuntimeError):
             plan._find_rooms()
 
     def test_find_chairs(self):
         plan = Plan()
-        plan.plan = """
+        plan._load("""
 +-----------+------------------------------------+
 |           |                                    |
 | (closet)  |                                    |
@@ -254,25 +531,26 @@ class PlanTests(unittest.TestCase):
                            |                 P   |
                            |                     |
                            +---------------------+
-""".splitlines()
+""".splitlines())
         # find chairs
         found = {}
         for room in plan.find_chairs_in_rooms():
             found[room.name] = room.chairs
         self.assertEqual(found, {
-            'total': {'W': 14, 'P': 7, 'S': 3, 'C': 1 },
-            'balcony': { 'W': 0, 'P': 2, 'S': 0, 'C': 0 },
-            'bathroom': { 'W': 0, 'P': 1, 'S': 0, 'C': 0 },
-            'closet': { 'W': 0, 'P': 3, 'S': 0, 'C': 0 },
-            'kitchen': { 'W': 4, 'P': 0, 'S': 0, 'C': 0 },
-            'living room': { 'W': 7, 'P': 0, 'S': 2, 'C': 0 },
-            'office': { 'W': 2, 'P': 1, 'S': 0, 'C': 0 },
-            'sleeping room': { 'W': 1, 'P': 0, 'S': 1, 'C': 0 },
-            'toilet': { 'W': 0, 'P': 0, 'S': 0, 'C': 1 },
+            # [W, P, S, C]
+            'total': [14, 7, 3, 1],
+            'balcony': [0, 2, 0, 0],
+            'bathroom': [0, 1, 0, 0],
+            'closet': [0, 3, 0, 0],
+            'kitchen': [4, 0, 0, 0],
+            'living room': [7, 0, 2, 0],
+            'office': [2, 1, 0, 0],
+            'sleeping room': [1, 0, 1, 0],
+            'toilet': [0, 0, 0, 1],
         })
 
         # all cells are visited
-        for row in plan.plan:
+        for row in plan._lines():
             for cell in row.strip():
                 self.assertTrue(cell == VISITED or cell in WALL_TYPES)
 